@@ -0,0 +1,79 @@
+"""Сравнение размера и скорости чтения таблицы для разных кодеков и блоков"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.primitive_db.utils import (  # noqa: E402
+    create_table_manifest,
+    get_table_path,
+    load_table_data,
+    load_table_manifest,
+    save_table_data,
+    set_table_storage,
+)
+
+ROWS_COUNT = 100_000
+LOOKUPS_COUNT = 200
+CODECS = ("none", "zlib", "lzma")
+SEGMENT_SIZES = (100, 1000, 10000)
+
+
+def get_table_size(table_name):
+    """Возвращает суммарный размер файлов таблицы на диске"""
+    table_path = get_table_path(table_name)
+    return sum(
+        os.path.getsize(f"{table_path}/{filename}")
+        for filename in os.listdir(table_path)
+    )
+
+
+def measure(func, repeat=1):
+    """Возвращает среднее время выполнения функции"""
+    start_time = time.monotonic()
+    for _ in range(repeat):
+        func()
+    return (time.monotonic() - start_time) / repeat
+
+
+def main():
+    os.chdir(tempfile.mkdtemp())
+    os.makedirs("data")
+
+    rows = [
+        {"ID": i, "name": f"user_{i}", "age": 18 + i % 60, "is_active": i % 3 == 0}
+        for i in range(1, ROWS_COUNT + 1)
+    ]
+    save_table_data("bench", create_table_manifest(), rows)
+    del rows
+
+    lookup_ids = range(1, ROWS_COUNT + 1, ROWS_COUNT // LOOKUPS_COUNT)
+
+    print(f"Записей: {ROWS_COUNT}")
+    print(f"{'кодек':>6} {'блок':>6} {'размер, КБ':>11} {'скан, мс':>9} "
+          f"{'точечно, мс':>12}")
+    for codec in CODECS:
+        for segment_size in SEGMENT_SIZES:
+            set_table_storage("bench", codec, segment_size)
+
+            size = get_table_size("bench")
+            scan_time = measure(
+                lambda: load_table_data("bench", load_table_manifest("bench"))
+            )
+            lookup_ids_iter = iter(lookup_ids)
+            lookup_time = measure(
+                lambda: load_table_data(
+                    "bench", load_table_manifest("bench"),
+                    {"ID": next(lookup_ids_iter)},
+                ),
+                repeat=len(lookup_ids),
+            )
+
+            print(f"{codec:>6} {segment_size:>6} {size / 1024:>11.0f} "
+                  f"{scan_time * 1000:>9.1f} {lookup_time * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Сравнение памяти и скорости WHERE для str и category столбцов"""
+import os
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.primitive_db.core import filter_records  # noqa: E402
+from src.primitive_db.encoding import encode_clause  # noqa: E402
+from src.primitive_db.utils import (  # noqa: E402
+    create_table_manifest,
+    load_table_data,
+    load_table_dictionaries,
+    load_table_manifest,
+    save_table_data,
+    save_table_dictionaries,
+)
+
+ROWS_COUNT = 200_000
+WHERE_REPEAT = 20
+STATUSES = ("new", "in_progress", "done", "cancelled", "on_hold")
+
+
+def measure_load(table_name):
+    """Загружает таблицу и возвращает данные и занятую ими память"""
+    tracemalloc.start()
+    data = load_table_data(table_name, load_table_manifest(table_name))
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, memory
+
+
+def measure_where(data, where_clause):
+    """Возвращает лучшее время фильтрации записей через core.filter_records"""
+    timer = timeit.Timer(lambda: filter_records(data, where_clause))
+    best_time = min(timer.repeat(repeat=WHERE_REPEAT, number=1))
+    return best_time, len(filter_records(data, where_clause))
+
+
+def main():
+    os.chdir(tempfile.mkdtemp())
+    os.makedirs("data")
+
+    rows = [
+        {"ID": i, "status": STATUSES[i % len(STATUSES)]}
+        for i in range(1, ROWS_COUNT + 1)
+    ]
+    save_table_data("plain", create_table_manifest(), rows)
+
+    manifest = create_table_manifest()
+    dictionaries = load_table_dictionaries(manifest, {"status": "category"})
+    encoded_rows = [encode_clause(row, dictionaries, extend=True) for row in rows]
+    save_table_dictionaries("encoded", manifest, dictionaries)
+    save_table_data("encoded", manifest, encoded_rows)
+    del rows, encoded_rows
+
+    plain_data, plain_memory = measure_load("plain")
+    plain_time, plain_matched = measure_where(plain_data, {"status": "done"})
+    del plain_data
+
+    encoded_data, encoded_memory = measure_load("encoded")
+    manifest = load_table_manifest("encoded")
+    dictionaries = load_table_dictionaries(manifest, {"status": "category"})
+    where_clause = encode_clause({"status": "done"}, dictionaries)
+    encoded_time, encoded_matched = measure_where(encoded_data, where_clause)
+
+    assert plain_matched == encoded_matched
+
+    print(f"Записей: {ROWS_COUNT}, различных значений: {len(STATUSES)}")
+    print(f"str:      память {plain_memory / 2**20:.1f} МБ, "
+          f"WHERE {plain_time * 1000:.1f} мс")
+    print(f"category: память {encoded_memory / 2**20:.1f} МБ, "
+          f"WHERE {encoded_time * 1000:.1f} мс")
+    print(f"Экономия памяти: {1 - encoded_memory / plain_memory:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
-ALLOWED_COLUMNS_TYPES = ("int", "str", "bool")
+ALLOWED_COLUMNS_TYPES = ("int", "str", "bool", "category")
+DICTIONARY_ENCODED_TYPES = ("category",)
+COLUMN_TYPE_DEFAULTS = {"int": 0, "str": "", "bool": False, "category": ""}
+DICTIONARY_MISSING_CODE = -1
 ACTION_SKIP_FLAG = 'ACTION_SKIP_FLAG'
 
 INSERT_PATTERN = r'insert\s+into\s+(\w+)\s+values\s*\((.*)\)'
@@ -6,9 +9,19 @@ INSERT_VALUE_PATTERN = r"(?:'[^']*'|[^,]+)"
 SELECT_PATTERN = r'select\s+from\s+(\w+)(?:\s+where\s+(.+))?'
 UPDATE_PATTERN = r'update\s+(\w+)\s+set\s+(.+)\s+where\s+(.+)'
 DELETE_PATTERN = r'delete\s+from\s+(\w+)\s+where\s+(.+)'
+ALTER_ADD_PATTERN = (
+    r'alter_table\s+(\w+)\s+add\s+(\w+\s*:\s*\w+)(?:\s+default\s+(.+?))?\s*$'
+)
+ALTER_DROP_PATTERN = r'alter_table\s+(\w+)\s+drop\s+(\w+)\s*$'
 
 WHERE_CLAUSE_PATTERN = r'(\w+)\s*=\s*(.+)'
 SET_CLAUSE_PATTERN = r'(\w+)\s*=\s*(.+)'
 
 DATA_FOLDER_PATH = "./data"
 DB_META_FILEPATH = "./db_meta.json"
+
+TABLE_SEGMENT_SIZE = 1000
+TABLE_CODECS = ("none", "zlib", "lzma")
+TABLE_MANIFEST_FILENAME = "manifest.json"
+TABLE_INDEX_FILENAME = "index.json"
+LEGACY_TABLE_BACKUP_SUFFIX = ".bak"
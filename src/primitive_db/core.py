@@ -1,13 +1,38 @@
 from prettytable import PrettyTable
 
-from src.primitive_db.constants import ALLOWED_COLUMNS_TYPES
+from src.primitive_db.constants import (
+    ALLOWED_COLUMNS_TYPES,
+    COLUMN_TYPE_DEFAULTS,
+    DICTIONARY_ENCODED_TYPES,
+    TABLE_CODECS,
+)
 from src.primitive_db.decorators import (
     confirm_action,
     create_cacher,
     handle_db_errors,
     log_time,
 )
-from src.primitive_db.utils import load_table_data, save_table_data
+from src.primitive_db.encoding import decode_value, encode_clause
+from src.primitive_db.utils import (
+    delete_table_dictionary,
+    get_max_record_id,
+    get_record_count,
+    get_schema_version,
+    get_segment_id,
+    get_table_storage,
+    get_where_segment_ids,
+    iter_table_segments,
+    load_table_dictionaries,
+    load_table_index,
+    load_table_manifest,
+    load_table_segment,
+    record_schema_change,
+    save_table_dictionaries,
+    save_table_index,
+    save_table_segment,
+    save_table_segments,
+    set_table_storage,
+)
 
 select_cache = create_cacher()
 
@@ -21,19 +46,7 @@ def create_table(metadata, table_name, columns):
     parsed_columns = []
 
     for col in columns:
-        if ":" not in col:
-            raise ValueError(
-                f"Некорректный формат столбца: '{col}'. Ожидается формат 'name:type'"
-            )
-        col_name, col_type = map(str.strip, col.split(":", 1))
-
-        if col_type not in ALLOWED_COLUMNS_TYPES:
-            raise ValueError(
-                f"Некорректный тип данных '{col_type}' в столбце '{col_name}'. "
-                f"Допустимые типы: {ALLOWED_COLUMNS_TYPES}"
-            )
-
-        parsed_columns.append((col_name, col_type))
+        parsed_columns.append(parse_column(col))
 
     if not any(col[0] == "ID" for col in parsed_columns):
         parsed_columns.insert(0, ("ID", "int"))
@@ -50,6 +63,81 @@ def create_table(metadata, table_name, columns):
     return metadata
 
 
+def parse_column(col):
+    """Разбирает описание столбца 'name:type' и проверяет тип"""
+    if ":" not in col:
+        raise ValueError(
+            f"Некорректный формат столбца: '{col}'. Ожидается формат 'name:type'"
+        )
+    col_name, col_type = map(str.strip, col.split(":", 1))
+
+    if col_type not in ALLOWED_COLUMNS_TYPES:
+        raise ValueError(
+            f"Некорректный тип данных '{col_type}' в столбце '{col_name}'. "
+            f"Допустимые типы: {ALLOWED_COLUMNS_TYPES}"
+        )
+
+    return col_name, col_type
+
+
+@handle_db_errors
+def add_column(metadata, table_name, column, default_str=None):
+    """Добавляет столбец в схему таблицы без перезаписи существующих записей"""
+    if table_name not in metadata:
+        raise KeyError(f"Таблица '{table_name}' не существует")
+
+    col_name, col_type = parse_column(column)
+
+    if col_name in metadata[table_name]:
+        raise ValueError(f"Столбец '{col_name}' уже существует в таблице")
+
+    if default_str is None:
+        default = COLUMN_TYPE_DEFAULTS[col_type]
+    else:
+        try:
+            default = convert_value(default_str, col_type)
+        except ValueError as e:
+            raise ValueError(
+                f"Ошибка валидации значения по умолчанию для столбца "
+                f"'{col_name}': {e}"
+            ) from e
+
+    manifest = load_table_manifest(table_name)
+
+    if col_type in DICTIONARY_ENCODED_TYPES:
+        dictionaries = load_table_dictionaries(manifest, {col_name: col_type})
+        default = encode_clause({col_name: default}, dictionaries, extend=True)
+        default = default[col_name]
+        save_table_dictionaries(table_name, manifest, dictionaries)
+
+    record_schema_change(table_name, manifest, "add", col_name, default)
+    metadata[table_name][col_name] = col_type
+
+    return metadata
+
+
+@confirm_action("удаление столбца")
+@handle_db_errors
+def drop_column(metadata, table_name, col_name):
+    """Удаляет столбец из схемы таблицы без перезаписи существующих записей"""
+    if table_name not in metadata:
+        raise KeyError(f"Таблица '{table_name}' не существует")
+
+    if col_name not in metadata[table_name]:
+        raise ValueError(f"Столбец '{col_name}' не существует в таблице")
+
+    if col_name == "ID":
+        raise ValueError("Нельзя удалить столбец ID")
+
+    manifest = load_table_manifest(table_name)
+    if metadata[table_name][col_name] in DICTIONARY_ENCODED_TYPES:
+        delete_table_dictionary(manifest, col_name)
+    record_schema_change(table_name, manifest, "drop", col_name)
+    del metadata[table_name][col_name]
+
+    return metadata
+
+
 @confirm_action("удаление таблицы")
 @handle_db_errors
 def drop_table(metadata, table_name):
@@ -93,31 +181,38 @@ def insert(metadata, table_name, values):
                 f"Ошибка валидации для столбца '{col_name}': {e}"
             ) from e
     
-    table_data = load_table_data(table_name)
-    
-    if not table_data:
-        table_data = []
-    
-    if table_data:
-        existing_ids = [record["ID"] for record in table_data]
-        new_id = max(existing_ids) + 1
-    else:
-        new_id = 1
+    manifest = load_table_manifest(table_name)
+    index = load_table_index(table_name, manifest)
+    new_id = get_max_record_id(index) + 1
+    segment_id = get_segment_id(new_id, manifest["segment_size"])
+    segment_data = load_table_segment(table_name, manifest, segment_id)
     
     new_record = {"ID": new_id}
     for i, col_name in enumerate(data_columns):
         new_record[col_name] = converted_values[i]
     
-    table_data.append(new_record)
-    save_table_data(table_name, table_data)
+    dictionaries = load_table_dictionaries(manifest, table_schema)
+    if dictionaries:
+        new_record = encode_clause(new_record, dictionaries, extend=True)
+        save_table_dictionaries(table_name, manifest, dictionaries)
+    
+    segment_data.append(new_record)
+    save_table_segments(table_name, manifest, index, {segment_id: segment_data})
     
     return new_id
 
 
 @log_time
 @handle_db_errors
-def select(table_data, where_clause=None):
-    """Выбирает записи из таблицы с опциональным условием WHERE"""
+def select(table_data, where_clause=None, dictionaries=None):
+    """Выбирает записи из таблицы с опциональным условием WHERE.
+
+    Значения столбцов из dictionaries хранятся в записях кодами и
+    декодируются только при выводе.
+    """
+    if dictionaries is None:
+        dictionaries = {}
+    
     if not table_data:
         return "Записей не найдено"
     
@@ -129,16 +224,7 @@ def select(table_data, where_clause=None):
     
     def compute_result():
         if where_clause:
-            filtered_data = []
-            for record in table_data:
-                match = True
-                for column, value in where_clause.items():
-                    if record[column] != value:
-                        match = False
-                        break
-                if match:
-                    filtered_data.append(record)
-            data_to_display = filtered_data
+            data_to_display = filter_records(table_data, where_clause)
         else:
             data_to_display = table_data
         
@@ -149,7 +235,7 @@ def select(table_data, where_clause=None):
         table = PrettyTable(columns)
         
         for record in data_to_display:
-            row = [record[col] for col in columns]
+            row = [decode_value(col, record[col], dictionaries) for col in columns]
             table.add_row(row)
         
         return table.get_string()
@@ -158,57 +244,84 @@ def select(table_data, where_clause=None):
 
 
 @handle_db_errors
-def update(table_data, set_clause, where_clause):
-    """Обновляет записи в таблице"""
-    updated_records_ids = set()
+def update(table_name, manifest, set_clause, where_clause, dictionaries=None):
+    """Обновляет записи в таблице, перезаписывая только измененные сегменты.
 
-    if not table_data:
-        return updated_records_ids
+    Значения, добавленные в dictionaries при кодировании SET, сохраняются
+    перед записью первого измененного сегмента, то есть только если
+    обновлена хотя бы одна запись.
+    """
+    updated_records_ids = set()
+    index = None
+    segment_ids = get_where_segment_ids(manifest, where_clause)
     
-    for record in table_data:
-        match = True
-        for column, value in where_clause.items():
-            if record[column] != value:
-                match = False
-                break
+    for segment_id, rows in iter_table_segments(table_name, manifest, segment_ids):
+        segment_updated_ids = set()
         
-        if match:
-            for column, value in set_clause.items():
-                record[column] = value
-            updated_records_ids.add(record["ID"])
+        for record in rows:
+            if match_record(record, where_clause):
+                for column, value in set_clause.items():
+                    record[column] = value
+                segment_updated_ids.add(record["ID"])
+        
+        if segment_updated_ids:
+            if index is None:
+                if dictionaries:
+                    save_table_dictionaries(table_name, manifest, dictionaries)
+                index = load_table_index(table_name, manifest)
+            save_table_segment(table_name, manifest, index, segment_id, rows)
+            updated_records_ids |= segment_updated_ids
+    
+    if index is not None:
+        save_table_index(table_name, manifest, index)
     
     return updated_records_ids
 
 
 @confirm_action("удаление записей из таблицы")
 @handle_db_errors
-def delete(table_data, where_clause):
-    """Удаляет записи из таблицы"""
+def delete(table_name, manifest, where_clause):
+    """Удаляет записи из таблицы, перезаписывая только измененные сегменты"""
     deleted_records_ids = set()
-
-    if not table_data:
-        return deleted_records_ids
-    
-    records_to_keep = []
+    index = None
+    segment_ids = get_where_segment_ids(manifest, where_clause)
     
-    for record in table_data:
-        match = True
-        for column, value in where_clause.items():
-            if record[column] != value:
-                match = False
-                break
+    for segment_id, rows in iter_table_segments(table_name, manifest, segment_ids):
+        records_to_keep = []
+        segment_deleted_ids = set()
         
-        if match:
-            deleted_records_ids.add(record["ID"])
-        else:
-            records_to_keep.append(record)
+        for record in rows:
+            if match_record(record, where_clause):
+                segment_deleted_ids.add(record["ID"])
+            else:
+                records_to_keep.append(record)
+        
+        if segment_deleted_ids:
+            if index is None:
+                index = load_table_index(table_name, manifest)
+            save_table_segment(table_name, manifest, index, segment_id,
+                               records_to_keep)
+            deleted_records_ids |= segment_deleted_ids
     
-    table_data.clear()
-    table_data.extend(records_to_keep)
+    if index is not None:
+        save_table_index(table_name, manifest, index)
     
     return deleted_records_ids
 
 
+def filter_records(table_data, where_clause):
+    """Возвращает записи, удовлетворяющие условию WHERE"""
+    return [record for record in table_data if match_record(record, where_clause)]
+
+
+def match_record(record, where_clause):
+    """Проверяет, удовлетворяет ли запись условию WHERE"""
+    for column, value in where_clause.items():
+        if record[column] != value:
+            return False
+    return True
+
+
 @handle_db_errors
 def info(metadata, table_name):
     """Выводит информацию о таблице"""
@@ -222,19 +335,43 @@ def info(metadata, table_name):
         columns_info.append(f"{col_name}:{col_type}")
     columns_str = ", ".join(columns_info)
     
-    table_data = load_table_data(table_name)
-    if not table_data:
-        record_count = 0
-    else:
-        record_count = len(table_data)
+    manifest = load_table_manifest(table_name)
+    record_count = get_record_count(load_table_index(table_name, manifest))
+    schema_version = get_schema_version(manifest)
+    codec, segment_size = get_table_storage(manifest)
     
     result = f"Таблица: {table_name}\n"
     result += f"Столбцы: {columns_str}\n"
+    result += f"Версия схемы: {schema_version}\n"
+    result += f"Хранение: кодек {codec}, блок {segment_size} записей\n"
     result += f"Количество записей: {record_count}"
     
     return result
 
 
+@handle_db_errors
+def set_storage(metadata, table_name, codec, segment_size_str=None):
+    """Меняет кодек сжатия и размер блока таблицы, перезаписывая ее данные"""
+    if table_name not in metadata:
+        raise KeyError(f"Таблица '{table_name}' не существует")
+
+    if codec not in TABLE_CODECS:
+        raise ValueError(
+            f"Некорректный кодек '{codec}'. Допустимые кодеки: {TABLE_CODECS}"
+        )
+
+    if segment_size_str is None:
+        _, segment_size = get_table_storage(load_table_manifest(table_name))
+    else:
+        segment_size = convert_value(segment_size_str, "int")
+        if segment_size <= 0:
+            raise ValueError("Размер блока должен быть положительным числом")
+
+    set_table_storage(table_name, codec, segment_size)
+
+    return codec, segment_size
+
+
 def convert_value(value_str, expected_type):
     """Преобразует строковое значение в нужный тип"""
     value_str = value_str.strip()
@@ -244,7 +381,7 @@ def convert_value(value_str, expected_type):
             return int(value_str)
         except ValueError:
             raise ValueError(f"Невозможно преобразовать '{value_str}' в int")
-    elif expected_type == "str":
+    elif expected_type in ("str", "category"):
         if value_str.startswith("'") and value_str.endswith("'"):
             return value_str[1:-1]
         else:
@@ -0,0 +1,45 @@
+from src.primitive_db.constants import DICTIONARY_MISSING_CODE
+
+
+def create_dictionary(values):
+    """Создает словарь кодирования столбца по списку его значений"""
+    return {
+        "values": values,
+        "codes": {value: code for code, value in enumerate(values)},
+        "changed": False,
+    }
+
+
+def encode_clause(clause, dictionaries, extend=False):
+    """Заменяет значения словарно кодируемых столбцов их целочисленными кодами.
+
+    Если значения нет в словаре, то при extend=True оно добавляется в словарь,
+    иначе подставляется код, не совпадающий ни с одной записью.
+    """
+    encoded_clause = dict(clause)
+
+    for column, value in clause.items():
+        if column not in dictionaries:
+            continue
+
+        dictionary = dictionaries[column]
+        code = dictionary["codes"].get(value)
+
+        if code is None and extend:
+            code = len(dictionary["values"])
+            dictionary["values"].append(value)
+            dictionary["codes"][value] = code
+            dictionary["changed"] = True
+        elif code is None:
+            code = DICTIONARY_MISSING_CODE
+
+        encoded_clause[column] = code
+
+    return encoded_clause
+
+
+def decode_value(column, value, dictionaries):
+    """Возвращает исходное значение столбца по его коду"""
+    if column not in dictionaries:
+        return value
+    return dictionaries[column]["values"][value]
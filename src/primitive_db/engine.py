@@ -4,6 +4,8 @@ import shlex
 from prompt import string
 
 from src.primitive_db.constants import (
+    ALTER_ADD_PATTERN,
+    ALTER_DROP_PATTERN,
     DELETE_PATTERN,
     INSERT_PATTERN,
     INSERT_VALUE_PATTERN,
@@ -11,21 +13,30 @@ from src.primitive_db.constants import (
     UPDATE_PATTERN,
 )
 from src.primitive_db.core import (
+    add_column,
     create_table,
     delete,
+    drop_column,
     drop_table,
     info,
     insert,
     select,
+    set_storage,
     update,
 )
+from src.primitive_db.encoding import encode_clause
 from src.primitive_db.parser import parse_set, parse_where
 from src.primitive_db.utils import (
     clear_table_data,
+    compact_table,
+    create_table_manifest,
     load_metadata,
     load_table_data,
+    load_table_dictionaries,
+    load_table_manifest,
+    migrate_legacy_table_data,
     save_metadata,
-    save_table_data,
+    save_table_manifest,
 )
 
 
@@ -36,6 +47,9 @@ def run():
 
     print_help()
 
+    for table_name in load_metadata():
+        migrate_legacy_table_data(table_name)
+
     while True:
         metadata = load_metadata()
 
@@ -67,7 +81,7 @@ def run():
                     continue
 
                 save_metadata(metadata)
-                save_table_data(table_name, [])
+                save_table_manifest(table_name, create_table_manifest())
                 print(f"Таблица '{table_name}' успешно создана")
             case "drop_table":
                 if len(args) < 2:
@@ -82,6 +96,62 @@ def run():
                 save_metadata(metadata)
                 clear_table_data(table_name)
                 print(f"Таблица '{table_name}' успешно удалена")
+            case "alter_table":
+                add_match = re.search(ALTER_ADD_PATTERN, user_input)
+                drop_match = re.search(ALTER_DROP_PATTERN, user_input)
+
+                if add_match:
+                    table_name = add_match.group(1)
+                    column = add_match.group(2)
+                    default_str = add_match.group(3)
+                    metadata = add_column(metadata, table_name, column, default_str)
+                    message = f"Столбец '{column}' добавлен в таблицу '{table_name}'"
+                elif drop_match:
+                    table_name = drop_match.group(1)
+                    column = drop_match.group(2)
+                    metadata = drop_column(metadata, table_name, column)
+                    message = f"Столбец '{column}' удален из таблицы '{table_name}'"
+                else:
+                    print("Ошибка: некорректный формат команды alter_table")
+                    print("Использование: alter_table <имя_таблицы> "
+                        "add <столбец:тип> [default <значение>] | "
+                        "drop <столбец>")
+                    continue
+
+                if is_result_should_be_skipped(metadata):
+                    continue
+
+                save_metadata(metadata)
+                print(message)
+            case "compact":
+                if len(args) < 2:
+                    print("Ошибка: недостаточно аргументов для compact")
+                    print("Использование: compact <имя_таблицы>")
+                    continue
+                table_name = args[1]
+                if table_name not in metadata:
+                    print(f"Ошибка: Таблица '{table_name}' не существует")
+                    continue
+
+                rewritten_count = compact_table(table_name)
+                print(f"Таблица '{table_name}' уплотнена, "
+                      f"переписано сегментов: {rewritten_count}")
+            case "set_storage":
+                if len(args) < 3:
+                    print("Ошибка: недостаточно аргументов для set_storage")
+                    print("Использование: set_storage <имя_таблицы> "
+                        "<none|zlib|lzma> [размер_блока]")
+                    continue
+                table_name = args[1]
+                codec = args[2]
+                segment_size_str = args[3] if len(args) > 3 else None
+                storage = set_storage(metadata, table_name, codec, segment_size_str)
+                if is_result_should_be_skipped(storage):
+                    continue
+
+                codec, segment_size = storage
+                print(f"Таблица '{table_name}' перезаписана: кодек {codec}, "
+                      f"блок {segment_size} записей")
             case "list_tables":
                 if not metadata:
                     print("Нет созданных таблиц")
@@ -147,13 +217,18 @@ def run():
                     continue
                 
                 table_schema = metadata[table_name]
-                table_data = load_table_data(table_name)
                 
                 where_clause = parse_where(where_str, table_schema)
                 if is_result_should_be_skipped(where_clause):
                     continue
                 
-                result = select(table_data, where_clause)
+                manifest = load_table_manifest(table_name)
+                dictionaries = load_table_dictionaries(manifest, table_schema)
+                if where_clause:
+                    where_clause = encode_clause(where_clause, dictionaries)
+                table_data = load_table_data(table_name, manifest, where_clause)
+                
+                result = select(table_data, where_clause, dictionaries)
                 if is_result_should_be_skipped(result):
                     continue
                 print(result)
@@ -175,7 +250,6 @@ def run():
                     continue
                 
                 table_schema = metadata[table_name]
-                table_data = load_table_data(table_name)
                 
                 set_clause = parse_set(set_str, table_schema)
                 where_clause = parse_where(where_str, table_schema)
@@ -184,13 +258,17 @@ def run():
                     is_result_should_be_skipped(where_clause)):
                     continue
                 
-                updated_records_ids = update(table_data, set_clause, where_clause)
+                manifest = load_table_manifest(table_name)
+                dictionaries = load_table_dictionaries(manifest, table_schema)
+                where_clause = encode_clause(where_clause, dictionaries)
+                set_clause = encode_clause(set_clause, dictionaries, extend=True)
+                
+                updated_records_ids = update(
+                    table_name, manifest, set_clause, where_clause, dictionaries
+                )
                 if is_result_should_be_skipped(updated_records_ids):
                     continue
                 
-                if updated_records_ids:
-                    save_table_data(table_name, table_data)
-                
                 if len(updated_records_ids) > 1:
                     print(f"Записи с ID={updated_records_ids} в таблице "
                             f"{table_name} успешно обновлены")
@@ -216,19 +294,19 @@ def run():
                     continue
                 
                 table_schema = metadata[table_name]
-                table_data = load_table_data(table_name)
                 
                 where_clause = parse_where(where_str, table_schema)
                 if is_result_should_be_skipped(where_clause):
                     continue
                 
-                deleted_records_ids = delete(table_data, where_clause)
+                manifest = load_table_manifest(table_name)
+                dictionaries = load_table_dictionaries(manifest, table_schema)
+                where_clause = encode_clause(where_clause, dictionaries)
+                
+                deleted_records_ids = delete(table_name, manifest, where_clause)
                 if is_result_should_be_skipped(deleted_records_ids):
                     continue
                 
-                if deleted_records_ids:
-                    save_table_data(table_name, table_data)
-                
                 if len(deleted_records_ids) > 1:
                     print(f"Записи с ID={deleted_records_ids} "
                             f"успешно удалены из таблицы {table_name}")
@@ -248,9 +326,18 @@ def print_help():
     print("\n***Процесс работы с таблицей***")
     print("Функции:")
     print("<command> create_table <имя_таблицы> <столбец1:тип> .. - создать таблицу")
+    print("Типы столбцов: int, str, bool, category (строка с малым числом "
+        "различных значений)")
     print("<command> list_tables - показать список всех таблиц")
     print("<command> drop_table <имя_таблицы> - удалить таблицу")
     print("<command> info <имя_таблицы> - вывести информацию о таблице")
+    print("<command> alter_table <имя_таблицы> add <столбец:тип> " \
+        "[default <значение>] - добавить столбец")
+    print("<command> alter_table <имя_таблицы> drop <столбец> - удалить столбец")
+    print("<command> compact <имя_таблицы> - перезаписать данные " \
+        "по текущей схеме")
+    print("<command> set_storage <имя_таблицы> <none|zlib|lzma> " \
+        "[размер_блока] - настроить сжатие таблицы")
 
     print("\n***Операции с данными***")
     print("Функции:")
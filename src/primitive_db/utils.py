@@ -1,7 +1,19 @@
 import json
+import lzma
 import os
+import shutil
+import zlib
 
-from src.primitive_db.constants import DATA_FOLDER_PATH, DB_META_FILEPATH
+from src.primitive_db.constants import (
+    DATA_FOLDER_PATH,
+    DB_META_FILEPATH,
+    DICTIONARY_ENCODED_TYPES,
+    LEGACY_TABLE_BACKUP_SUFFIX,
+    TABLE_INDEX_FILENAME,
+    TABLE_MANIFEST_FILENAME,
+    TABLE_SEGMENT_SIZE,
+)
+from src.primitive_db.encoding import create_dictionary
 
 
 def load_metadata():
@@ -19,23 +31,401 @@ def save_metadata(data):
         json.dump(data, f, indent=2)
 
 
-def load_table_data(table_name):
-    """Загружает данные таблицы из JSON-файла"""
+def get_table_path(table_name):
+    """Возвращает путь к каталогу с сегментами таблицы"""
+    return f"{DATA_FOLDER_PATH}/{table_name}"
+
+
+def get_segment_id(record_id, segment_size):
+    """Возвращает номер сегмента, в котором хранится запись с данным ID"""
+    return (record_id - 1) // segment_size
+
+
+def load_table_manifest(table_name):
+    """Загружает манифест таблицы: параметры хранения, схему и словари"""
+    manifest_path = f"{get_table_path(table_name)}/{TABLE_MANIFEST_FILENAME}"
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return create_table_manifest()
+
+
+def create_table_manifest():
+    """Создает пустой манифест таблицы"""
+    return {
+        "segment_size": TABLE_SEGMENT_SIZE,
+        "codec": "none",
+        "generation": 0,
+        "schema_version": 1,
+        "schema_changes": [],
+    }
+
+
+def save_table_manifest(table_name, manifest):
+    """Атомарно сохраняет манифест таблицы"""
+    manifest_path = f"{get_table_path(table_name)}/{TABLE_MANIFEST_FILENAME}"
+    write_file_atomically(manifest_path, json.dumps(manifest, indent=2))
+
+
+def get_index_path(table_name, manifest):
+    """Возвращает путь к индексу сегментов текущего поколения таблицы"""
+    generation = manifest.get("generation", 0)
+    name = TABLE_INDEX_FILENAME
+    if generation:
+        name = name.replace(".json", f".gen{generation}.json")
+    return f"{get_table_path(table_name)}/{name}"
+
+
+def load_table_index(table_name, manifest):
+    """Загружает индекс сегментов: количество записей и диапазон ID каждого"""
     try:
-        with open(f"{DATA_FOLDER_PATH}/{table_name}.json", "r", encoding="utf-8") as f:
+        with open(get_index_path(table_name, manifest), "r", encoding="utf-8") as f:
             return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_table_index(table_name, manifest, index):
+    """Атомарно сохраняет индекс сегментов в компактном виде"""
+    write_file_atomically(get_index_path(table_name, manifest),
+                          json.dumps(index, separators=(",", ":")))
+
+
+def write_file_atomically(path, content):
+    """Записывает файл через временный файл и os.replace"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(f"{path}.tmp", path)
+
+
+def migrate_legacy_table_data(table_name):
+    """Переносит таблицу из единого JSON-файла в сегментированный формат.
+
+    Исходный файл переименовывается в резервную копию только после того,
+    как записаны все сегменты, индекс и манифест.
+    """
+    legacy_path = f"{DATA_FOLDER_PATH}/{table_name}.json"
+    if not os.path.exists(legacy_path):
+        return
+
+    with open(legacy_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    manifest = create_table_manifest()
+    index = {}
+    segments = split_into_segments(data, manifest["segment_size"])
+    for segment_id, rows in sorted(segments.items()):
+        save_table_segment(table_name, manifest, index, segment_id, rows)
+    save_table_index(table_name, manifest, index)
+    save_table_manifest(table_name, manifest)
+
+    os.replace(legacy_path, f"{legacy_path}{LEGACY_TABLE_BACKUP_SUFFIX}")
+
+
+def split_into_segments(data, segment_size):
+    """Группирует записи по номерам сегментов"""
+    segments = {}
+    for record in data:
+        segment_id = get_segment_id(record["ID"], segment_size)
+        segments.setdefault(segment_id, []).append(record)
+    return segments
+
+
+def get_segment_path(table_name, manifest, segment_id):
+    """Возвращает путь к файлу сегмента с учетом поколения и кодека таблицы"""
+    generation = manifest.get("generation", 0)
+    codec = manifest.get("codec", "none")
+    name = f"segment_{segment_id}"
+    if generation:
+        name += f".gen{generation}"
+    name += ".json"
+    if codec != "none":
+        name += f".{codec}"
+    return f"{get_table_path(table_name)}/{name}"
+
+
+def compress_block(data, codec):
+    """Сжимает байты блока выбранным кодеком"""
+    if codec == "zlib":
+        return zlib.compress(data)
+    if codec == "lzma":
+        return lzma.compress(data)
+    return data
+
+
+def decompress_block(data, codec):
+    """Распаковывает байты блока, сжатого выбранным кодеком"""
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "lzma":
+        return lzma.decompress(data)
+    return data
+
+
+def load_table_segment(table_name, manifest, segment_id):
+    """Загружает записи одного сегмента, приводя их к текущей версии схемы"""
+    segment_path = get_segment_path(table_name, manifest, segment_id)
+    try:
+        with open(segment_path, "rb") as f:
+            block = f.read()
     except FileNotFoundError:
         return []
 
+    block = decompress_block(block, manifest.get("codec", "none"))
+    segment = json.loads(block.decode("utf-8"))
+    rows = segment["rows"]
 
-def save_table_data(table_name, data):
-    """Сохраняет переданные данные таблицы в JSON-файл"""
-    with open(f"{DATA_FOLDER_PATH}/{table_name}.json", "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    if segment["schema_version"] < manifest.get("schema_version", 1):
+        apply_schema_changes(rows, manifest.get("schema_changes", []),
+                             segment["schema_version"])
+    return rows
+
+
+def apply_schema_changes(rows, schema_changes, from_version):
+    """Применяет к записям изменения схемы, появившиеся после from_version"""
+    for change in schema_changes:
+        if change["version"] <= from_version:
+            continue
+        column = change["column"]
+        if change["action"] == "add":
+            for record in rows:
+                record[column] = change["default"]
+        elif change["action"] == "drop":
+            for record in rows:
+                record.pop(column, None)
+
+
+def save_table_segment(table_name, manifest, index, segment_id, rows):
+    """Сохраняет записи одного сегмента и обновляет его запись в индексе"""
+    segment_path = get_segment_path(table_name, manifest, segment_id)
+    segment_key = str(segment_id)
+
+    if not rows:
+        index.pop(segment_key, None)
+        if os.path.exists(segment_path):
+            os.remove(segment_path)
+        return
+
+    schema_version = manifest.get("schema_version", 1)
+    segment = {"schema_version": schema_version, "rows": rows}
+
+    os.makedirs(get_table_path(table_name), exist_ok=True)
+    codec = manifest.get("codec", "none")
+    if codec == "none":
+        block = json.dumps(segment, indent=2).encode("utf-8")
+    else:
+        block = json.dumps(segment, separators=(",", ":")).encode("utf-8")
+        block = compress_block(block, codec)
+
+    with open(segment_path, "wb") as f:
+        f.write(block)
+
+    ids = [record["ID"] for record in rows]
+    index[segment_key] = {
+        "count": len(rows),
+        "min_id": min(ids),
+        "max_id": max(ids),
+        "schema_version": schema_version,
+    }
+
+
+def iter_table_segments(table_name, manifest, segment_ids=None):
+    """Лениво загружает сегменты таблицы, возвращая пары (номер, записи).
+
+    Если номера сегментов не переданы, их список берется из индекса.
+    """
+    if segment_ids is None:
+        segment_ids = load_table_index(table_name, manifest)
+
+    for segment_id in sorted(int(key) for key in segment_ids):
+        rows = load_table_segment(table_name, manifest, segment_id)
+        if rows:
+            yield segment_id, rows
+
+
+def get_where_segment_ids(manifest, where_clause):
+    """Возвращает номера сегментов, которые нужно прочитать для условия WHERE.
+
+    None означает, что нужно прочитать все сегменты.
+    """
+    if where_clause and "ID" in where_clause:
+        return {get_segment_id(where_clause["ID"], manifest["segment_size"])}
+    return None
+
+
+def load_table_data(table_name, manifest, where_clause=None):
+    """Загружает данные таблицы, читая только нужные по условию WHERE сегменты"""
+    segment_ids = get_where_segment_ids(manifest, where_clause)
+
+    data = []
+    for _, rows in iter_table_segments(table_name, manifest, segment_ids):
+        data.extend(rows)
+    return data
+
+
+def get_max_record_id(index):
+    """Возвращает максимальный ID в таблице по индексу, не читая сегменты"""
+    return max((segment["max_id"] for segment in index.values()), default=0)
+
+
+def get_record_count(index):
+    """Возвращает количество записей в таблице по индексу"""
+    return sum(segment["count"] for segment in index.values())
+
+
+def get_schema_version(manifest):
+    """Возвращает текущую версию схемы таблицы"""
+    return manifest.get("schema_version", 1)
+
+
+def load_table_dictionaries(manifest, table_schema):
+    """Загружает словари кодирования для столбцов типа category"""
+    dictionaries = manifest.get("dictionaries", {})
+    return {
+        col_name: create_dictionary(dictionaries.get(col_name, []))
+        for col_name, col_type in table_schema.items()
+        if col_type in DICTIONARY_ENCODED_TYPES
+    }
+
+
+def save_table_dictionaries(table_name, manifest, dictionaries):
+    """Сохраняет в манифест словари, в которые были добавлены значения"""
+    changed = {
+        column: dictionary for column, dictionary in dictionaries.items()
+        if dictionary["changed"]
+    }
+    if not changed:
+        return
+
+    manifest.setdefault("dictionaries", {}).update(
+        {column: dictionary["values"] for column, dictionary in changed.items()}
+    )
+    save_table_manifest(table_name, manifest)
+    for dictionary in changed.values():
+        dictionary["changed"] = False
+
+
+def delete_table_dictionary(manifest, column):
+    """Удаляет словарь кодирования столбца из манифеста таблицы"""
+    manifest.get("dictionaries", {}).pop(column, None)
+
+
+def save_table_segments(table_name, manifest, index, segments):
+    """Сохраняет переданные сегменты вида {номер: записи}, не трогая остальные"""
+    for segment_id, rows in sorted(segments.items()):
+        save_table_segment(table_name, manifest, index, segment_id, rows)
+    save_table_index(table_name, manifest, index)
+
+
+def save_table_data(table_name, manifest, data):
+    """Перезаписывает все данные таблицы по сегментам"""
+    index = load_table_index(table_name, manifest)
+    segments = split_into_segments(data, manifest["segment_size"])
+
+    for segment_key in index:
+        segments.setdefault(int(segment_key), [])
+
+    save_table_segments(table_name, manifest, index, segments)
+
+
+def record_schema_change(table_name, manifest, action, column, default=None):
+    """Повышает версию схемы таблицы, не переписывая существующие сегменты"""
+    manifest["schema_version"] = manifest.get("schema_version", 1) + 1
+
+    change = {"version": manifest["schema_version"], "action": action,
+              "column": column}
+    if action == "add":
+        change["default"] = default
+    manifest.setdefault("schema_changes", []).append(change)
+
+    save_table_manifest(table_name, manifest)
+    return manifest["schema_version"]
+
+
+def compact_table(table_name):
+    """Переписывает сегменты, сохраненные в устаревшей версии схемы.
+
+    Возвращает количество переписанных сегментов.
+    """
+    manifest = load_table_manifest(table_name)
+    index = load_table_index(table_name, manifest)
+    current_version = manifest.get("schema_version", 1)
+
+    stale_ids = [
+        int(key) for key, segment in index.items()
+        if segment["schema_version"] < current_version
+    ]
+    for segment_id in sorted(stale_ids):
+        rows = load_table_segment(table_name, manifest, segment_id)
+        save_table_segment(table_name, manifest, index, segment_id, rows)
+    save_table_index(table_name, manifest, index)
+
+    manifest["schema_changes"] = []
+    save_table_manifest(table_name, manifest)
+    return len(stale_ids)
+
+
+def get_table_storage(manifest):
+    """Возвращает кодек сжатия и размер сегмента таблицы"""
+    return manifest.get("codec", "none"), manifest["segment_size"]
+
+
+def set_table_storage(table_name, codec, segment_size):
+    """Перезаписывает таблицу с новым кодеком сжатия и размером сегмента.
+
+    Сегменты и индекс нового поколения пишутся рядом со старыми, затем
+    манифест атомарно переключается на них, и только после этого старые
+    файлы удаляются. Прерванная перезапись оставляет таблицу в прежнем виде.
+    """
+    manifest = load_table_manifest(table_name)
+    new_manifest = dict(
+        manifest,
+        codec=codec,
+        segment_size=segment_size,
+        generation=manifest.get("generation", 0) + 1,
+        schema_changes=[],
+    )
+    new_index = {}
+
+    current_id = None
+    current_rows = []
+    for _, rows in iter_table_segments(table_name, manifest):
+        for record in sorted(rows, key=lambda record: record["ID"]):
+            segment_id = get_segment_id(record["ID"], segment_size)
+            if segment_id != current_id and current_rows:
+                save_table_segment(table_name, new_manifest, new_index,
+                                   current_id, current_rows)
+                current_rows = []
+            current_id = segment_id
+            current_rows.append(record)
+    if current_rows:
+        save_table_segment(table_name, new_manifest, new_index,
+                           current_id, current_rows)
+
+    save_table_index(table_name, new_manifest, new_index)
+    save_table_manifest(table_name, new_manifest)
+
+    table_path = get_table_path(table_name)
+    live_paths = {get_index_path(table_name, new_manifest)} | {
+        get_segment_path(table_name, new_manifest, int(segment_key))
+        for segment_key in new_index
+    }
+    for filename in os.listdir(table_path):
+        path = f"{table_path}/{filename}"
+        is_data_file = filename.startswith(("segment_", "index"))
+        if is_data_file and path not in live_paths:
+            os.remove(path)
 
 
 def clear_table_data(table_name):
-    """Удаляет файл с таблицей"""
-    table_path = f"{DATA_FOLDER_PATH}/{table_name}.json"
+    """Удаляет файлы с таблицей"""
+    legacy_path = f"{DATA_FOLDER_PATH}/{table_name}.json"
+    for path in (legacy_path, f"{legacy_path}{LEGACY_TABLE_BACKUP_SUFFIX}"):
+        if os.path.exists(path):
+            os.remove(path)
+
+    table_path = get_table_path(table_name)
     if os.path.exists(table_path):
-        os.remove(table_path)
+        shutil.rmtree(table_path)